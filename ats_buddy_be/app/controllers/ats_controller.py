@@ -1,4 +1,5 @@
-from fastapi import UploadFile
+import orjson
+from fastapi import Response, UploadFile
 
 from app.models.schemas import (
     ATSCheckRequest,
@@ -6,7 +7,11 @@ from app.models.schemas import (
     ResumeOptimizeRequest,
 )
 from app.services.ats_service import ATSService
-from app.views.response_view import success_response
+from app.views.response_view import model_response
+
+# Encoded once at import; liveness probes hit this constantly. A fresh Response
+# is still built per request because middlewares mutate response headers.
+_HEALTH_BODY = orjson.dumps({"success": True, "data": {"message": "ATS Buddy backend is running"}})
 
 
 class ATSController:
@@ -14,20 +19,20 @@ class ATSController:
         self.service = ATSService()
 
     def health(self):
-        return success_response({"message": "ATS Buddy backend is running"})
+        return Response(content=_HEALTH_BODY, media_type="application/json")
 
     def check_ats(self, payload: ATSCheckRequest):
         result = self.service.check_ats(payload)
-        return success_response(result.model_dump())
+        return model_response(result)
 
     def optimize_resume(self, payload: ResumeOptimizeRequest):
         result = self.service.optimize_resume(payload)
-        return success_response(result.model_dump())
+        return model_response(result)
 
     def keyword_gap(self, payload: KeywordGapRequest):
         result = self.service.keyword_gap(payload)
-        return success_response(result.model_dump())
+        return model_response(result)
 
     async def extract_resume_text(self, file: UploadFile):
         result = await self.service.extract_resume_text(file)
-        return success_response(result.model_dump())
+        return model_response(result)
@@ -1,24 +1,25 @@
 from app.models.schemas import GoogleAuthRequest, LoginRequest, RegisterRequest, RegisteredUser
-from app.services.auth_service import AuthService
-from app.views.response_view import success_response
+from app.services.auth_dependency import auth_service
+from app.views.response_view import model_response
 
 
 class AuthController:
     def __init__(self) -> None:
-        self.service = AuthService()
+        # Reuse the dependency's service so each process holds a single MySQL pool.
+        self.service = auth_service
 
     def register(self, payload: RegisterRequest):
         user = self.service.register(payload)
-        return success_response(user.model_dump(), status_code=201)
+        return model_response(user, status_code=201)
 
     def login(self, payload: LoginRequest):
         auth = self.service.login(payload)
-        return success_response(auth.model_dump())
+        return model_response(auth)
 
     def google_auth(self, payload: GoogleAuthRequest):
         auth = self.service.google_auth(payload)
-        return success_response(auth.model_dump())
+        return model_response(auth)
 
     @staticmethod
     def me(current_user: RegisteredUser):
-        return success_response(current_user.model_dump())
+        return model_response(current_user)
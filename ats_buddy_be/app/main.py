@@ -1,21 +1,54 @@
 import os
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from anyio import to_thread
+from fastapi import FastAPI, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.utils import is_body_allowed_for_status_code
 from dotenv import load_dotenv
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.routes.auth_routes import router as auth_router
 from app.routes.ats_routes import router as ats_router
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Sync routes and offloaded file parsing share this limiter (anyio default: 40).
+    to_thread.current_default_thread_limiter().total_tokens = int(os.getenv("THREAD_POOL_SIZE", "64"))
+    yield
+
+
 app = FastAPI(
     title="ATS Buddy UAE API",
     version="1.0.0",
     description="ATS checker and resume optimizer APIs for UAE market",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 
+# Same payloads as FastAPI's default handlers, but encoded with orjson so
+# 4xx responses do not fall back to the stdlib JSON encoder.
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(_: Request, exc: StarletteHTTPException) -> Response:
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(_: Request, exc: RequestValidationError) -> ORJSONResponse:
+    return ORJSONResponse({"detail": jsonable_encoder(exc.errors())}, status_code=422)
+
+
 def _build_allowed_origins() -> list[str]:
     origins_from_env = os.getenv("ALLOWED_ORIGINS", "").strip()
     if origins_from_env:
@@ -29,12 +62,20 @@ def _build_allowed_origins() -> list[str]:
     ]
 
 
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+_ALLOWED_ORIGINS = tuple(_build_allowed_origins())
+# A bare wildcard lets CORSMiddleware skip per-request origin lookups. Browsers
+# reject credentialed responses for "*", and auth here uses bearer headers anyway.
+_ALLOW_ALL_ORIGINS = _ALLOWED_ORIGINS == ("*",)
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_build_allowed_origins(),
-    allow_credentials=True,
+    allow_origins=list(_ALLOWED_ORIGINS),
+    allow_credentials=not _ALLOW_ALL_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 app.include_router(ats_router)
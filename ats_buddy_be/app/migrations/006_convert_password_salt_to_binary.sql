@@ -0,0 +1,2 @@
+ALTER TABLE users
+    MODIFY COLUMN password_salt VARBINARY(255) NULL;
@@ -0,0 +1,3 @@
+UPDATE users
+SET password_salt = UNHEX(password_salt)
+WHERE password_salt IS NOT NULL;
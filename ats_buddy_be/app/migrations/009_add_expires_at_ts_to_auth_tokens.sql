@@ -0,0 +1,2 @@
+ALTER TABLE auth_tokens
+    ADD COLUMN expires_at_ts BIGINT NOT NULL DEFAULT 0;
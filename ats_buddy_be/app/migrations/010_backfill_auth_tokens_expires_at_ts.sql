@@ -0,0 +1,3 @@
+UPDATE auth_tokens
+SET expires_at_ts = TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', expires_at)
+WHERE expires_at_ts = 0;
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import ORJSONResponse
 
 from app.controllers.ats_controller import ATSController
 from app.models.schemas import ATSCheckRequest, KeywordGapRequest, RegisteredUser, ResumeOptimizeRequest
 from app.services.auth_dependency import get_current_user
 
-router = APIRouter(prefix="/api/v1", tags=["ATS Buddy"])
+router = APIRouter(prefix="/api/v1", tags=["ATS Buddy"], default_response_class=ORJSONResponse)
 controller = ATSController()
 
 
@@ -13,22 +14,22 @@ def health_check():
     return controller.health()
 
 
-@router.post("/ats/check")
+@router.post("/ats/check", response_model=None)
 def ats_check(payload: ATSCheckRequest, _: RegisteredUser = Depends(get_current_user)):
     return controller.check_ats(payload)
 
 
-@router.post("/resume/optimize")
+@router.post("/resume/optimize", response_model=None)
 def resume_optimize(payload: ResumeOptimizeRequest, _: RegisteredUser = Depends(get_current_user)):
     return controller.optimize_resume(payload)
 
 
-@router.post("/resume/keyword-gap")
+@router.post("/resume/keyword-gap", response_model=None)
 def resume_keyword_gap(payload: KeywordGapRequest, _: RegisteredUser = Depends(get_current_user)):
     return controller.keyword_gap(payload)
 
 
-@router.post("/resume/extract-text")
+@router.post("/resume/extract-text", response_model=None)
 async def resume_extract_text(
     file: UploadFile = File(...),
     _: RegisteredUser = Depends(get_current_user),
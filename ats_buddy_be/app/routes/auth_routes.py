@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 
 from app.controllers.auth_controller import AuthController
 from app.models.schemas import GoogleAuthRequest, LoginRequest, RegisterRequest
 from app.services.auth_dependency import get_current_user
 
-router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
+router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"], default_response_class=ORJSONResponse)
 controller = AuthController()
 
 
@@ -1,10 +1,16 @@
+import hashlib
+import heapq
 import re
 from collections import Counter
-from io import BytesIO
-from typing import List, Set, Tuple
+from io import BytesIO, StringIO
+from threading import Lock
+from typing import AbstractSet, Any, Callable, FrozenSet, Iterable, List, Optional, Tuple
 
+import pymupdf
+from cachetools import LRUCache, TTLCache
 from docx import Document
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pypdf import PdfReader
 
 from app.models.schemas import (
@@ -18,16 +24,18 @@ from app.models.schemas import (
     ScoreBreakdown,
 )
 
+_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z\-\+\.]{1,}")
+_WS_RE = re.compile(r"\s+")
 
-class ATSService:
-    REQUIRED_SECTIONS = [
-        "summary",
-        "experience",
-        "skills",
-        "education",
-    ]
-
-    UAE_KEYWORDS = {
+_REQUIRED_SECTIONS: Tuple[str, ...] = (
+    "summary",
+    "experience",
+    "skills",
+    "education",
+)
+
+_UAE_KEYWORDS: FrozenSet[str] = frozenset(
+    {
         "uae",
         "gcc",
         "dubai",
@@ -41,8 +49,10 @@ class ATSService:
         "vat",
         "esr",
     }
+)
 
-    STOPWORDS = {
+_STOPWORDS: FrozenSet[str] = frozenset(
+    {
         "the",
         "a",
         "an",
@@ -70,20 +80,84 @@ class ATSService:
         "will",
         "can",
     }
+)
+
 
-    SUPPORTED_FILE_TYPES = {"pdf", "docx"}
+def _text_digest(*parts: Optional[str]) -> bytes:
+    # Fixed-size cache key, so cached entries do not keep submitted texts alive.
+    # Parts are length-prefixed so different splits of the same text never collide.
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if part is None:
+            digest.update(b"N")
+            continue
+        data = part.encode("utf-8", "surrogatepass")
+        digest.update(b"S%d:" % len(data))
+        digest.update(data)
+    return digest.digest()
+
+
+_KeywordAnalysis = Tuple[FrozenSet[str], Tuple[Tuple[str, int], ...]]
+_KEYWORD_CACHE: LRUCache[bytes, _KeywordAnalysis] = LRUCache(maxsize=512)
+_KEYWORD_CACHE_LOCK = Lock()
+
+
+def _analyze_keywords(lower_text: str) -> _KeywordAnalysis:
+    # Expects already-lowercased text. Results are cached per text digest, so they
+    # are returned as immutable containers.
+    key = _text_digest(lower_text)
+    with _KEYWORD_CACHE_LOCK:
+        cached = _KEYWORD_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    stripped = (token.strip("-+.") for token in _TOKEN_RE.findall(lower_text))
+    counts = Counter(
+        token
+        for token in stripped
+        if len(token) > 2 and token not in _STOPWORDS and not token.isnumeric()
+    )
+    result = frozenset(counts), tuple(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+    with _KEYWORD_CACHE_LOCK:
+        _KEYWORD_CACHE[key] = result
+    return result
+
+
+class ATSService:
+    REQUIRED_SECTIONS = _REQUIRED_SECTIONS
+    UAE_KEYWORDS = _UAE_KEYWORDS
+    STOPWORDS = _STOPWORDS
+
+    SUPPORTED_FILE_TYPES = frozenset({"pdf", "docx"})
+    MAX_EXTRACTED_CHARS = 500_000
+
+    def __init__(self) -> None:
+        # Scoring is deterministic, so repeat submissions of the same texts within
+        # a few minutes are answered from memory. Cached models must not be mutated.
+        self._result_cache: TTLCache[Tuple[Any, ...], Any] = TTLCache(maxsize=1000, ttl=300)
+        self._result_cache_lock = Lock()
 
     def check_ats(self, payload: ATSCheckRequest) -> ATSCheckResponse:
-        resume_tokens = self._extract_keywords(payload.resume_text)
-        jd_tokens = self._extract_keywords(payload.job_description)
+        key = (
+            "ats",
+            _text_digest(payload.resume_text, payload.job_description, payload.target_role, payload.industry),
+        )
+        return self._cached(key, lambda: self._check_ats(payload))
 
-        matched = sorted(jd_tokens.intersection(resume_tokens))
-        missing = sorted(jd_tokens.difference(resume_tokens))
+    def _check_ats(self, payload: ATSCheckRequest) -> ATSCheckResponse:
+        lower_resume = payload.resume_text.lower()
+        lower_jd = payload.job_description.lower()
+        resume_tokens = self._extract_keywords(lower_resume)
+        jd_tokens = self._extract_keywords(lower_jd)
 
-        keyword_match_score = self._safe_percentage(len(matched), max(len(jd_tokens), 1))
-        section_score, section_gaps = self._evaluate_sections(payload.resume_text)
+        missing = jd_tokens - resume_tokens
+        matched = jd_tokens - missing
+        jd_count = len(jd_tokens)
+
+        keyword_match_score = self._safe_percentage(jd_count - len(missing), max(jd_count, 1))
+        section_score, section_gaps = self._evaluate_sections(lower_resume)
         readability_score = self._readability_score(payload.resume_text)
-        uae_fit_score = self._uae_fit_score(payload.resume_text, payload.job_description)
+        uae_fit_score = self._uae_fit_score(lower_resume, lower_jd)
 
         overall = round(
             (
@@ -102,43 +176,39 @@ class ATSService:
             uae_fit_score=uae_fit_score,
         )
 
-        return ATSCheckResponse(
+        return ATSCheckResponse.model_construct(
             overall_score=overall,
-            breakdown=ScoreBreakdown(
+            breakdown=ScoreBreakdown.model_construct(
                 keyword_match=keyword_match_score,
                 section_completeness=section_score,
                 readability=readability_score,
                 uae_market_fit=uae_fit_score,
             ),
-            missing_keywords=missing[:25],
-            matched_keywords=matched[:25],
+            missing_keywords=heapq.nsmallest(25, missing),
+            matched_keywords=heapq.nsmallest(25, matched),
             section_gaps=section_gaps,
             recommendations=recommendations,
         )
 
     def optimize_resume(self, payload: ResumeOptimizeRequest) -> ResumeOptimizeResponse:
+        lower_resume = payload.resume_text.lower()
         resume_lines = [line.strip() for line in payload.resume_text.splitlines() if line.strip()]
         rewritten_bullets = self._rewrite_bullets_for_impact(resume_lines)
 
         skills_to_add: List[str] = []
         if payload.job_description:
-            gap = self.keyword_gap(
-                KeywordGapRequest(
-                    resume_text=payload.resume_text,
-                    job_description=payload.job_description,
-                )
-            )
+            gap = self._keyword_gap(lower_resume, payload.job_description.lower())
             skills_to_add = gap.high_priority_keywords[:10]
 
         optimized_summary = self._build_uae_summary(
-            payload.resume_text,
+            lower_resume,
             payload.target_role,
             payload.preferred_emirate,
         )
 
-        tips = self._uae_localization_tips(payload.resume_text, payload.preferred_emirate)
+        tips = self._uae_localization_tips(lower_resume, payload.preferred_emirate)
 
-        return ResumeOptimizeResponse(
+        return ResumeOptimizeResponse.model_construct(
             optimized_summary=optimized_summary,
             rewritten_bullets=rewritten_bullets[:8],
             skills_to_add=skills_to_add,
@@ -146,18 +216,24 @@ class ATSService:
         )
 
     def keyword_gap(self, payload: KeywordGapRequest) -> KeywordGapResponse:
-        resume_tokens = self._extract_keywords(payload.resume_text)
-        jd_tokens = self._extract_keywords(payload.job_description)
+        key = ("gap", _text_digest(payload.resume_text, payload.job_description))
+        return self._cached(
+            key,
+            lambda: self._keyword_gap(payload.resume_text.lower(), payload.job_description.lower()),
+        )
 
-        missing = sorted(jd_tokens - resume_tokens)
-        token_freq = self._token_frequency(payload.job_description)
+    def _keyword_gap(self, lower_resume: str, lower_jd: str) -> KeywordGapResponse:
+        resume_tokens = self._extract_keywords(lower_resume)
+        jd_tokens, token_freq = self._tokenize_and_count(lower_jd)
+
+        missing = jd_tokens - resume_tokens
         high_priority = [token for token, _ in token_freq if token in missing][:15]
 
-        matched = len(jd_tokens.intersection(resume_tokens))
-        coverage = round(self._safe_percentage(matched, max(len(jd_tokens), 1)), 2)
+        jd_count = len(jd_tokens)
+        coverage = round(self._safe_percentage(jd_count - len(missing), max(jd_count, 1)), 2)
 
-        return KeywordGapResponse(
-            missing_keywords=missing[:30],
+        return KeywordGapResponse.model_construct(
+            missing_keywords=heapq.nsmallest(30, missing),
             high_priority_keywords=high_priority,
             coverage_percentage=coverage,
         )
@@ -174,19 +250,21 @@ class ATSService:
         if not file_bytes:
             raise ValueError("Uploaded file is empty")
 
+        parser = self._extract_text_from_pdf if extension == "pdf" else self._extract_text_from_docx
         try:
-            if extension == "pdf":
-                extracted_text = self._extract_text_from_pdf(file_bytes)
-            else:
-                extracted_text = self._extract_text_from_docx(file_bytes)
+            # Parsing is CPU-bound; keep it off the event loop so other requests progress.
+            extracted_text = await run_in_threadpool(parser, file_bytes)
         except Exception as exc:  # parser-level errors
             raise ValueError("Unable to parse the uploaded file. Please upload a valid PDF or DOCX.") from exc
 
-        normalized_text = re.sub(r"\s+", " ", extracted_text).strip()
+        if len(extracted_text) > self.MAX_EXTRACTED_CHARS:
+            raise ValueError("Uploaded file contains too much text to process")
+
+        normalized_text = _WS_RE.sub(" ", extracted_text).strip()
         if not normalized_text:
             raise ValueError("Could not extract readable text from the uploaded file")
 
-        return ResumeExtractResponse(
+        return ResumeExtractResponse.model_construct(
             file_name=file.filename,
             file_type=extension,
             extracted_text=normalized_text,
@@ -194,35 +272,39 @@ class ATSService:
         )
 
     def _extract_text_from_pdf(self, file_bytes: bytes) -> str:
-        reader = PdfReader(BytesIO(file_bytes))
-        pages = [page.extract_text() or "" for page in reader.pages]
-        return "\n".join(pages)
+        try:
+            with pymupdf.open(stream=file_bytes, filetype="pdf") as document:
+                return self._join_within_budget(page.get_text("text") for page in document)
+        except Exception:  # fall back to the pure-Python parser for files MuPDF rejects
+            reader = PdfReader(BytesIO(file_bytes))
+            return self._join_within_budget(page.extract_text() or "" for page in reader.pages)
 
     def _extract_text_from_docx(self, file_bytes: bytes) -> str:
         document = Document(BytesIO(file_bytes))
-        return "\n".join(paragraph.text for paragraph in document.paragraphs)
-
-    def _extract_keywords(self, text: str) -> Set[str]:
-        tokens = re.findall(r"[A-Za-z][A-Za-z\-\+\.]{1,}", text.lower())
-        cleaned = {token.strip("-+.") for token in tokens}
-        return {
-            token
-            for token in cleaned
-            if len(token) > 2 and token not in self.STOPWORDS and not token.isnumeric()
-        }
-
-    def _token_frequency(self, text: str) -> List[Tuple[str, int]]:
-        tokens = re.findall(r"[A-Za-z][A-Za-z\-\+\.]{1,}", text.lower())
-        filtered = [
-            token.strip("-+.")
-            for token in tokens
-            if len(token) > 2 and token not in self.STOPWORDS
-        ]
-        counts = Counter(filtered)
-        return sorted(counts.items(), key=lambda item: item[1], reverse=True)
-
-    def _evaluate_sections(self, resume_text: str) -> Tuple[float, List[str]]:
-        lower_resume = resume_text.lower()
+        return self._join_within_budget(paragraph.text for paragraph in document.paragraphs)
+
+    def _join_within_budget(self, chunks: Iterable[str]) -> str:
+        # Stops pulling chunks once the budget is exceeded, so oversized documents
+        # are not parsed to the end; the caller rejects the over-budget result.
+        buffer = StringIO()
+        size = 0
+        for chunk in chunks:
+            if size:
+                buffer.write("\n")
+                size += 1
+            buffer.write(chunk)
+            size += len(chunk)
+            if size > self.MAX_EXTRACTED_CHARS:
+                break
+        return buffer.getvalue()
+
+    def _extract_keywords(self, lower_text: str) -> FrozenSet[str]:
+        return _analyze_keywords(lower_text)[0]
+
+    def _tokenize_and_count(self, lower_text: str) -> _KeywordAnalysis:
+        return _analyze_keywords(lower_text)
+
+    def _evaluate_sections(self, lower_resume: str) -> Tuple[float, List[str]]:
         gaps = [section for section in self.REQUIRED_SECTIONS if section not in lower_resume]
         score = round(((len(self.REQUIRED_SECTIONS) - len(gaps)) / len(self.REQUIRED_SECTIONS)) * 100, 2)
         return score, gaps
@@ -242,14 +324,14 @@ class ATSService:
             return 60.0
         return 45.0
 
-    def _uae_fit_score(self, resume_text: str, job_description: str) -> float:
-        combined = f"{resume_text.lower()} {job_description.lower()}"
+    def _uae_fit_score(self, lower_resume: str, lower_jd: str) -> float:
+        combined = f"{lower_resume} {lower_jd}"
         matches = sum(1 for keyword in self.UAE_KEYWORDS if keyword in combined)
         return round(self._safe_percentage(matches, len(self.UAE_KEYWORDS)), 2)
 
     def _build_recommendations(
         self,
-        missing_keywords: List[str],
+        missing_keywords: AbstractSet[str],
         section_gaps: List[str],
         readability_score: float,
         uae_fit_score: float,
@@ -279,6 +361,9 @@ class ATSService:
         return recommendations
 
     def _rewrite_bullets_for_impact(self, resume_lines: List[str]) -> List[str]:
+        if not resume_lines:
+            return []
+
         action_verbs = [
             "Led",
             "Delivered",
@@ -292,7 +377,8 @@ class ATSService:
         rewritten: List[str] = []
 
         for index, line in enumerate(resume_lines[:12]):
-            if len(line.split()) < 4:
+            # maxsplit stops after the fourth word instead of splitting the whole line
+            if len(line.split(None, 3)) < 4:
                 continue
             verb = action_verbs[index % len(action_verbs)]
             sentence = line.rstrip(".")
@@ -302,14 +388,14 @@ class ATSService:
 
     def _build_uae_summary(
         self,
-        resume_text: str,
+        lower_resume: str,
         target_role: str | None,
         preferred_emirate: str | None,
     ) -> str:
         role_text = target_role or "target role"
         emirate_text = preferred_emirate or "UAE"
 
-        top_skills = sorted(self._extract_keywords(resume_text))[:6]
+        top_skills = sorted(self._extract_keywords(lower_resume))[:6]
         skill_text = ", ".join(top_skills[:4]) if top_skills else "cross-functional execution"
 
         return (
@@ -318,8 +404,7 @@ class ATSService:
             "fast-paced, multicultural environments aligned with UAE market expectations."
         )
 
-    def _uae_localization_tips(self, resume_text: str, preferred_emirate: str | None) -> List[str]:
-        lower_resume = resume_text.lower()
+    def _uae_localization_tips(self, lower_resume: str, preferred_emirate: str | None) -> List[str]:
         tips = []
 
         if "visa" not in lower_resume:
@@ -336,6 +421,17 @@ class ATSService:
 
         return tips[:6]
 
+    def _cached(self, key: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = compute()
+        with self._result_cache_lock:
+            self._result_cache[key] = result
+        return result
+
     @staticmethod
     def _safe_percentage(part: int | float, whole: int | float) -> float:
         if whole == 0:
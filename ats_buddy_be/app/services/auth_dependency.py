@@ -1,4 +1,10 @@
+import time
+from threading import Lock
+from typing import Tuple
+
+from cachetools import TTLCache
 from fastapi import Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from app.models.schemas import RegisteredUser
 from app.services.auth_service import AuthService
@@ -6,13 +12,35 @@ from app.services.auth_service import AuthService
 
 auth_service = AuthService()
 
+# Short-lived cache of token -> (user, expires_at) so bursts of requests skip the
+# DB lookup. The TTL bounds how long a user profile change can be served stale;
+# token expiry is still checked on every hit.
+_TOKEN_CACHE: TTLCache[str, Tuple[RegisteredUser, float]] = TTLCache(maxsize=10_000, ttl=60)
+_TOKEN_CACHE_LOCK = Lock()
+
 
-def get_current_user(authorization: str = Header(default="")) -> RegisteredUser:
+async def get_current_user(authorization: str = Header(default="")) -> RegisteredUser:
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Authorization header with Bearer token is required")
 
     token = authorization.split(" ", 1)[1].strip()
+    with _TOKEN_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(token)
+    if cached is not None:
+        cached_user, expires_at = cached
+        if expires_at > time.time():
+            return cached_user
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE.pop(token, None)
+        raise HTTPException(status_code=401, detail="Token expired")
+
+    # Cache hits are answered on the event loop; only the blocking Redis/MySQL
+    # lookup is sent to the threadpool.
     try:
-        return auth_service.authenticate_token(token)
+        user, expires_at = await run_in_threadpool(auth_service.authenticate_token, token)
     except ValueError as exc:
         raise HTTPException(status_code=401, detail=str(exc)) from exc
+
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE[token] = (user, expires_at)
+    return user
@@ -1,44 +1,112 @@
 import hashlib
+import hmac
 import os
 import secrets
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
-
-import mysql.connector
+from threading import BoundedSemaphore, Lock
+from typing import Any, Iterator, Optional, Tuple
+
+import orjson
+import redis
+import requests
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
 from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token as google_id_token
-from mysql.connector.abstracts import MySQLConnectionAbstract
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
+from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection
 
 from app.models.schemas import AuthResponse, GoogleAuthRequest, LoginRequest, RegisterRequest, RegisteredUser
+from app.services.db_config import now_utc, resolve_db_config
 from app.services.migration_service import MigrationService
 
+# Argon2id is memory-hard, so a cheaper time cost than the old PBKDF2 setting
+# still resists GPU cracking while keeping login verification fast.
+_PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+# Shared transport so JWKS fetches reuse one keep-alive connection pool to Google.
+_GOOGLE_REQUEST = google_requests.Request(session=requests.Session())
+
+# Verified Google claims keyed by sha256(id_token), so client retries with the
+# same token skip the signature check. Hits are still rejected past the token's exp.
+_GOOGLE_CLAIMS_CACHE: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=4096, ttl=300)
+_GOOGLE_CLAIMS_CACHE_LOCK = Lock()
+
+# Hot-path statements are built once at import rather than per call.
+_USER_COLUMNS = "id, full_name, email, password_hash, password_salt, google_sub, auth_provider, profile_image_url"
+_SELECT_USER_BY_EMAIL = f"SELECT {_USER_COLUMNS} FROM users WHERE email = %s"
+_SELECT_USER_BY_GOOGLE_SUB = f"SELECT {_USER_COLUMNS} FROM users WHERE google_sub = %s"
+_EMAIL_EXISTS = "SELECT 1 FROM users WHERE email = %s LIMIT 1"
+
+_SELECT_TOKEN_USER = """
+    SELECT u.id, u.full_name, u.email, u.profile_image_url, t.expires_at_ts
+    FROM auth_tokens t
+    JOIN users u ON u.id = t.user_id
+    WHERE t.access_token = %s
+    LIMIT 1
+"""
+
+_INSERT_AUTH_TOKEN = """
+    INSERT INTO auth_tokens (user_id, access_token, expires_at, expires_at_ts, created_at)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+# Creates the Google user, or links/refreshes the existing row for this email or
+# google_sub in the same statement. Rows already linked to a different Google
+# account are left untouched; google_sub is assigned last because MySQL applies
+# these assignments left to right and the conditions read its old value.
+_UPSERT_GOOGLE_USER = """
+    INSERT INTO users (full_name, email, password_hash, password_salt, created_at, google_sub, auth_provider, profile_image_url)
+    VALUES (%s, %s, %s, NULL, %s, %s, 'google', %s)
+    ON DUPLICATE KEY UPDATE
+        full_name = IF(google_sub IS NULL OR google_sub = %s, COALESCE(NULLIF(%s, ''), full_name), full_name),
+        profile_image_url = IF(google_sub IS NULL OR google_sub = %s, COALESCE(%s, profile_image_url), profile_image_url),
+        auth_provider = IF(google_sub IS NULL OR google_sub = %s, 'google', auth_provider),
+        google_sub = IF(google_sub IS NULL, %s, google_sub)
+"""
+
+_REFRESH_GOOGLE_PROFILE = """
+    UPDATE users
+    SET full_name = COALESCE(NULLIF(%s, ''), full_name),
+        profile_image_url = COALESCE(%s, profile_image_url)
+    WHERE google_sub = %s
+"""
+
 
 class AuthService:
+    TOKEN_CACHE_TTL_SECONDS = 300
+    PASSWORD_HASH_ITERATIONS = 120_000
+
     def __init__(self) -> None:
         MigrationService().run_migrations()
-        self.db_config = self._resolve_db_config()
+        self.db_config = resolve_db_config()
+        self._pool = self._build_connection_pool()
+        self._pool_slots = BoundedSemaphore(self.db_config["pool_size"])
+        self._redis = self._build_redis_client()
 
     def register(self, payload: RegisterRequest) -> RegisteredUser:
         email = payload.email.strip().lower()
-        if self._find_user_by_email(email) is not None:
+        if self._email_exists(email):
             raise ValueError("Email already registered")
 
-        salt = secrets.token_bytes(16)
-        password_hash = self._hash_password(payload.password, salt)
+        password_hash = _PASSWORD_HASHER.hash(payload.password)
 
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
                 INSERT INTO users (full_name, email, password_hash, password_salt, created_at)
-                VALUES (%s, %s, %s, %s, %s)
+                VALUES (%s, %s, %s, NULL, %s)
                 """,
                 (
                     payload.full_name.strip(),
                     email,
                     password_hash,
-                    salt.hex(),
-                    self._now_utc(),
+                    now_utc(),
                 ),
             )
             conn.commit()
@@ -59,11 +127,7 @@ class AuthService:
         if user.get("auth_provider") == "google":
             raise ValueError("This account uses Google sign-in. Please continue with Google.")
 
-        salt = bytes.fromhex(user["password_salt"])
-        expected_hash = user["password_hash"]
-        supplied_hash = self._hash_password(payload.password, salt)
-
-        if supplied_hash != expected_hash:
+        if not self._verify_password(user, payload.password):
             raise ValueError("Invalid email or password")
 
         return self._issue_auth_token(user)
@@ -78,160 +142,128 @@ class AuthService:
         if not google_sub or not email:
             raise ValueError("Invalid Google identity token")
 
-        user = self._find_user_by_google_sub(google_sub)
-        if user is not None:
-            self._update_google_profile(user["id"], full_name, profile_image_url)
-            refreshed_user = self._find_user_by_google_sub(google_sub)
-            if refreshed_user is None:
-                raise ValueError("Unable to refresh Google profile")
-            return self._issue_auth_token(refreshed_user)
-
-
-        user = self._find_user_by_email(email)
-        if user is not None:
-            if user.get("google_sub") and user.get("google_sub") != google_sub:
-                raise ValueError("Google account mismatch for this email")
-
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    UPDATE users
-                    SET google_sub = %s, auth_provider = %s, full_name = %s, profile_image_url = %s
-                    WHERE id = %s
-                    """,
-                    (google_sub, "google", full_name or user["full_name"], profile_image_url, user["id"]),
-                )
-                conn.commit()
-
-            linked_user = self._find_user_by_email(email)
-            if linked_user is None:
-                raise ValueError("Unable to link Google account")
-            return self._issue_auth_token(linked_user)
-
         new_user_name = full_name or email.split("@")[0]
-        salt = secrets.token_bytes(16)
-        placeholder_hash = self._hash_password(secrets.token_urlsafe(32), salt)
+        # Google accounts never log in with a password, so a random value that no
+        # password hash can match is enough and skips a full key derivation.
+        placeholder_hash = secrets.token_hex(32)
 
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO users (full_name, email, password_hash, password_salt, created_at, google_sub, auth_provider)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    new_user_name,
-                    email,
-                    placeholder_hash,
-                    salt.hex(),
-                    self._now_utc(),
-                    google_sub,
-                    "google",
-                ),
-            )
-            conn.commit()
-
-            if profile_image_url:
+            cursor = conn.cursor(dictionary=True)
+            try:
                 cursor.execute(
-                    "UPDATE users SET profile_image_url = %s WHERE email = %s",
-                    (profile_image_url, email),
+                    _UPSERT_GOOGLE_USER,
+                    (
+                        new_user_name,
+                        email,
+                        placeholder_hash,
+                        now_utc(),
+                        google_sub,
+                        profile_image_url,
+                        google_sub,
+                        full_name,
+                        google_sub,
+                        profile_image_url,
+                        google_sub,
+                        google_sub,
+                    ),
                 )
-                conn.commit()
+                inserted = cursor.rowcount == 1
+            except IntegrityError as exc:
+                if exc.errno != errorcode.ER_DUP_ENTRY:
+                    raise
+                # The email belongs to a separate unlinked account while this
+                # google_sub is already linked to another row; sign in to that row.
+                cursor.execute(_REFRESH_GOOGLE_PROFILE, (full_name, profile_image_url, google_sub))
+                inserted = False
+
+            if inserted:
+                # Fresh insert: every column value is already known here. The driver
+                # does not set CLIENT_FOUND_ROWS, so an upsert reports 1 only for an
+                # insert (2 = updated, 0 = matched but unchanged).
+                user = {
+                    "id": cursor.lastrowid,
+                    "full_name": new_user_name,
+                    "email": email,
+                    "password_hash": placeholder_hash,
+                    "password_salt": None,
+                    "google_sub": google_sub,
+                    "auth_provider": "google",
+                    "profile_image_url": profile_image_url,
+                }
+            else:
+                cursor.execute(_SELECT_USER_BY_GOOGLE_SUB, (google_sub,))
+                user = cursor.fetchone()
+            if user is None:
+                # The email belongs to a user already linked to a different Google account.
+                raise ValueError("Google account mismatch for this email")
 
-        created_user = self._find_user_by_email(email)
-        if created_user is None:
-            raise ValueError("Unable to create Google account")
+            # The user upsert and the token insert share a single commit.
+            auth = self._insert_auth_token(cursor, user)
+            conn.commit()
 
-        return self._issue_auth_token(created_user)
+        return auth
 
-    def authenticate_token(self, access_token: str) -> RegisteredUser:
+    def authenticate_token(self, access_token: str) -> Tuple[RegisteredUser, float]:
+        # Returns the token's expiry (unix seconds) too, so callers that cache the
+        # user can stop honouring the token as soon as it expires.
         if not access_token:
             raise ValueError("Missing access token")
 
-        query = """
-            SELECT u.id, u.full_name, u.email, u.profile_image_url, t.expires_at
-            FROM auth_tokens t
-            JOIN users u ON u.id = t.user_id
-            WHERE t.access_token = %s
-            ORDER BY t.id DESC
-            LIMIT 1
-        """
+        cache_key = self._token_cache_key(access_token)
+        cached = self._get_cached_token(cache_key)
+        if cached is not None:
+            if cached["expires_at"] <= time.time():
+                raise ValueError("Token expired")
+            return RegisteredUser(**cached["user"]), cached["expires_at"]
 
         with self._get_connection() as conn:
             cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, (access_token,))
+            cursor.execute(_SELECT_TOKEN_USER, (access_token,))
             token_row = cursor.fetchone()
 
         if token_row is None:
             raise ValueError("Invalid token")
 
-        expires_at = self._to_utc_datetime(token_row["expires_at"])
-
-        if expires_at <= datetime.now(timezone.utc):
+        expires_at = token_row["expires_at_ts"]
+        if expires_at <= time.time():
             raise ValueError("Token expired")
 
-        return RegisteredUser(
+        user = RegisteredUser(
             user_id=token_row["id"],
             full_name=token_row["full_name"],
             email=token_row["email"],
             profile_image_url=token_row.get("profile_image_url"),
         )
+        self._cache_token(cache_key, user, expires_at)
+        return user, expires_at
 
     def _find_user_by_email(self, email: str) -> Optional[dict[str, Any]]:
         with self._get_connection() as conn:
             cursor = conn.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT id, full_name, email, password_hash, password_salt, google_sub, auth_provider, profile_image_url FROM users WHERE email = %s",
-                (email,),
-            )
+            cursor.execute(_SELECT_USER_BY_EMAIL, (email,))
             return cursor.fetchone()
 
-    def _find_user_by_google_sub(self, google_sub: str) -> Optional[dict[str, Any]]:
+    def _email_exists(self, email: str) -> bool:
         with self._get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT id, full_name, email, password_hash, password_salt, google_sub, auth_provider, profile_image_url FROM users WHERE google_sub = %s",
-                (google_sub,),
-            )
-            return cursor.fetchone()
-
-    def _update_google_profile(self, user_id: int, full_name: str, profile_image_url: Optional[str]) -> None:
-        updates = []
-        params: list[Any] = []
-
-        if full_name:
-            updates.append("full_name = %s")
-            params.append(full_name)
-
-        if profile_image_url is not None:
-            updates.append("profile_image_url = %s")
-            params.append(profile_image_url)
-
-        if not updates:
-            return
+            cursor = conn.cursor()
+            cursor.execute(_EMAIL_EXISTS, (email,))
+            return cursor.fetchone() is not None
 
-        params.append(user_id)
-        query = f"UPDATE users SET {', '.join(updates)} WHERE id = %s"
+    def _issue_auth_token(self, user: dict[str, Any]) -> AuthResponse:
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, tuple(params))
+            auth = self._insert_auth_token(conn.cursor(), user)
             conn.commit()
+        return auth
 
-    def _issue_auth_token(self, user: dict[str, Any]) -> AuthResponse:
+    def _insert_auth_token(self, cursor: Any, user: dict[str, Any]) -> AuthResponse:
+        # Runs on the caller's transaction; the caller commits.
         token = secrets.token_urlsafe(48)
         expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
 
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO auth_tokens (user_id, access_token, expires_at, created_at)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (user["id"], token, expires_at, self._now_utc()),
-            )
-            conn.commit()
+        cursor.execute(
+            _INSERT_AUTH_TOKEN,
+            (user["id"], token, expires_at, int(expires_at.timestamp()), now_utc()),
+        )
 
         return AuthResponse(
             user_id=user["id"],
@@ -246,71 +278,117 @@ class AuthService:
         if not google_client_id:
             raise ValueError("Google sign-in is not configured on the server")
 
+        cache_key = hashlib.sha256(raw_id_token.encode("utf-8")).hexdigest()
+        with _GOOGLE_CLAIMS_CACHE_LOCK:
+            cached = _GOOGLE_CLAIMS_CACHE.get(cache_key)
+        if cached is not None and cached.get("exp", 0) > time.time():
+            return cached
+
         try:
             verified = google_id_token.verify_oauth2_token(
                 raw_id_token,
-                google_requests.Request(),
+                _GOOGLE_REQUEST,
                 google_client_id,
             )
             if not isinstance(verified, dict):
                 raise ValueError("Invalid Google identity token")
             if not verified.get("email_verified"):
                 raise ValueError("Google email is not verified")
-            return verified
         except ValueError:
             raise
         except Exception as exc:
             raise ValueError("Invalid Google identity token") from exc
 
-    def _get_connection(self, include_database: bool = True) -> MySQLConnectionAbstract:
-        config = {
-            "host": self.db_config["host"],
-            "port": self.db_config["port"],
-            "user": self.db_config["user"],
-            "password": self.db_config["password"],
-        }
+        with _GOOGLE_CLAIMS_CACHE_LOCK:
+            _GOOGLE_CLAIMS_CACHE[cache_key] = verified
+        return verified
 
-        if include_database:
-            config["database"] = self.db_config["database"]
+    @staticmethod
+    def _token_cache_key(access_token: str) -> str:
+        # Hash so raw bearer tokens never land in Redis.
+        return f"auth:tok:{hashlib.sha256(access_token.encode('utf-8')).hexdigest()}"
 
-        return mysql.connector.connect(**config)
+    def _get_cached_token(self, cache_key: str) -> Optional[dict[str, Any]]:
+        if self._redis is None:
+            return None
+        try:
+            cached = self._redis.get(cache_key)
+        except redis.RedisError:
+            return None
+        return orjson.loads(cached) if cached is not None else None
 
-    @staticmethod
-    def _hash_password(password: str, salt: bytes) -> str:
-        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
-        return digest.hex()
+    def _cache_token(self, cache_key: str, user: RegisteredUser, expires_at: float) -> None:
+        if self._redis is None:
+            return
+        ttl = min(int(expires_at - time.time()), self.TOKEN_CACHE_TTL_SECONDS)
+        if ttl <= 0:
+            return
+        payload = orjson.dumps({"user": user.model_dump(), "expires_at": expires_at})
+        try:
+            self._redis.setex(cache_key, ttl, payload)
+        except redis.RedisError:
+            pass
 
     @staticmethod
-    def _resolve_db_config() -> dict[str, Any]:
-        host = os.getenv("MYSQL_HOST", "localhost")
-        port = int(os.getenv("MYSQL_PORT", "3306"))
-        user = os.getenv("MYSQL_USER", "root")
-        password = os.getenv("MYSQL_PASSWORD", "")
-        database = os.getenv("MYSQL_DATABASE", "ats_buddy")
-
-        return {
-            "host": host,
-            "port": port,
-            "user": user,
-            "password": password,
-            "database": database,
-        }
+    def _build_redis_client() -> Optional[redis.Redis]:
+        redis_url = os.getenv("REDIS_URL", "").strip()
+        if not redis_url:
+            return None
+        # Short timeouts so a slow or unreachable Redis falls back to MySQL quickly.
+        return redis.Redis.from_url(redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+
+    @contextmanager
+    def _get_connection(self) -> Iterator[PooledMySQLConnection]:
+        # MySQLConnectionPool raises instead of waiting when exhausted, so callers
+        # queue on the semaphore until a pooled connection is free.
+        with self._pool_slots:
+            conn = self._pool.get_connection()
+            try:
+                yield conn
+            finally:
+                conn.close()  # returns the connection to the pool
+
+    def _build_connection_pool(self) -> MySQLConnectionPool:
+        return MySQLConnectionPool(
+            pool_name="ats_buddy_auth",
+            pool_size=self.db_config["pool_size"],
+            host=self.db_config["host"],
+            port=self.db_config["port"],
+            user=self.db_config["user"],
+            password=self.db_config["password"],
+            database=self.db_config["database"],
+        )
 
-    @staticmethod
-    def _now_utc() -> datetime:
-        return datetime.now(timezone.utc).replace(tzinfo=None)
+    def _verify_password(self, user: dict[str, Any], password: str) -> bool:
+        stored_hash = user["password_hash"]
+        if stored_hash.startswith("$argon2"):
+            try:
+                _PASSWORD_HASHER.verify(stored_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+            if _PASSWORD_HASHER.check_needs_rehash(stored_hash):
+                self._update_password_hash(user["id"], password)
+            return True
+
+        # Legacy PBKDF2 hash: verify once, then upgrade the row to Argon2id.
+        salt = user["password_salt"]  # raw 16 bytes (VARBINARY)
+        if not hmac.compare_digest(self._hash_password(password, salt), bytes.fromhex(stored_hash)):
+            return False
+        self._update_password_hash(user["id"], password)
+        return True
+
+    def _update_password_hash(self, user_id: int, password: str) -> None:
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE users SET password_hash = %s, password_salt = NULL WHERE id = %s",
+                (_PASSWORD_HASHER.hash(password), user_id),
+            )
+            conn.commit()
 
-    @staticmethod
-    def _to_utc_datetime(value: Any) -> datetime:
-        if isinstance(value, datetime):
-            if value.tzinfo is None:
-                return value.replace(tzinfo=timezone.utc)
-            return value.astimezone(timezone.utc)
-
-        if isinstance(value, str):
-            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
-            if parsed.tzinfo is None:
-                return parsed.replace(tzinfo=timezone.utc)
-            return parsed.astimezone(timezone.utc)
-
-        raise ValueError("Invalid token expiration format")
+    @classmethod
+    def _hash_password(cls, password: str, salt: bytes) -> bytes:
+        # Legacy scheme, only used to verify hashes stored before Argon2id.
+        # hashlib delegates to OpenSSL's PKCS5_PBKDF2_HMAC, which already runs the
+        # whole iteration loop in C with SHA-NI where the CPU supports it.
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, cls.PASSWORD_HASH_ITERATIONS)
@@ -0,0 +1,25 @@
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+
+def resolve_db_config() -> dict[str, Any]:
+    host = os.getenv("MYSQL_HOST", "localhost")
+    port = int(os.getenv("MYSQL_PORT", "3306"))
+    user = os.getenv("MYSQL_USER", "root")
+    password = os.getenv("MYSQL_PASSWORD", "")
+    database = os.getenv("MYSQL_DATABASE", "ats_buddy")
+    pool_size = int(os.getenv("MYSQL_POOL_SIZE", "8"))
+
+    return {
+        "host": host,
+        "port": port,
+        "user": user,
+        "password": password,
+        "database": database,
+        "pool_size": pool_size,
+    }
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,44 +1,68 @@
-import os
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
 
 import mysql.connector
 from mysql.connector.abstracts import MySQLConnectionAbstract
 
+from app.services.db_config import now_utc, resolve_db_config
+
+_DDL_KEYWORDS = frozenset({"ALTER", "CREATE", "DROP", "RENAME", "TRUNCATE"})
+_MIGRATION_LOCK_TIMEOUT_SECONDS = 120
+
 
 class MigrationService:
     def __init__(self) -> None:
-        self.db_config = self._resolve_db_config()
+        self.db_config = resolve_db_config()
         self.migrations_dir = Path(__file__).resolve().parents[1] / "migrations"
 
     def run_migrations(self) -> None:
         self._ensure_database_exists()
 
         with self._get_connection() as conn:
+            # Each worker process migrates on startup. A server-wide named lock makes
+            # them take turns, so later workers find the files already recorded.
+            # The lock is released when this connection closes.
+            self._acquire_migration_lock(conn)
             self._ensure_schema_migrations_table(conn)
             applied_versions = self._load_applied_versions(conn)
 
-            migration_files = sorted(self.migrations_dir.glob("*.sql"))
-            for migration_file in migration_files:
-                version = migration_file.stem
-                if version in applied_versions:
-                    continue
-
+            pending = [
+                migration_file
+                for migration_file in sorted(self.migrations_dir.glob("*.sql"))
+                if migration_file.stem not in applied_versions
+            ]
+            if not pending:
+                return
+
+            # MySQL commits implicitly around DDL, but not the version row written
+            # after it, so DDL migrations are committed as soon as they are recorded.
+            # Consecutive DML migrations share one commit with their version rows.
+            cursor = conn.cursor()
+            for migration_file in pending:
                 sql = migration_file.read_text(encoding="utf-8").strip()
                 if not sql:
                     continue
 
-                cursor = conn.cursor()
                 cursor.execute(sql)
                 cursor.execute(
                     """
                     INSERT INTO schema_migrations (version, filename, applied_at)
                     VALUES (%s, %s, %s)
                     """,
-                    (version, migration_file.name, self._now_utc()),
+                    (migration_file.stem, migration_file.name, now_utc()),
                 )
-                conn.commit()
+                if sql.split(None, 1)[0].upper() in _DDL_KEYWORDS:
+                    conn.commit()
+            conn.commit()
+
+    def _acquire_migration_lock(self, conn: MySQLConnectionAbstract) -> None:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT GET_LOCK(%s, %s)",
+            (f"{self.db_config['database']}.schema_migrations", _MIGRATION_LOCK_TIMEOUT_SECONDS),
+        )
+        (acquired,) = cursor.fetchone()
+        if acquired != 1:
+            raise RuntimeError("Timed out waiting for another process to finish migrations")
 
     def _ensure_database_exists(self) -> None:
         with self._get_connection(include_database=False) as conn:
@@ -81,26 +105,6 @@ class MigrationService:
 
         return mysql.connector.connect(**config)
 
-    @staticmethod
-    def _resolve_db_config() -> dict[str, Any]:
-        host = os.getenv("MYSQL_HOST", "localhost")
-        port = int(os.getenv("MYSQL_PORT", "3306"))
-        user = os.getenv("MYSQL_USER", "root")
-        password = os.getenv("MYSQL_PASSWORD", "")
-        database = os.getenv("MYSQL_DATABASE", "ats_buddy")
-
-        return {
-            "host": host,
-            "port": port,
-            "user": user,
-            "password": password,
-            "database": database,
-        }
-
-    @staticmethod
-    def _now_utc() -> datetime:
-        return datetime.now(timezone.utc).replace(tzinfo=None)
-
 
 def run_migrations() -> None:
     MigrationService().run_migrations()
@@ -1,21 +1,14 @@
-from fastapi.responses import JSONResponse
+from fastapi import Response
+from pydantic import BaseModel
 
+# The envelope never changes, so its bytes are spliced around the encoded payload
+# instead of building and encoding a wrapper dict per response.
+_SUCCESS_PREFIX = b'{"success":true,"data":'
+_SUFFIX = b"}"
 
-def success_response(data: dict, status_code: int = 200) -> JSONResponse:
-    return JSONResponse(
-        status_code=status_code,
-        content={
-            "success": True,
-            "data": data,
-        },
-    )
 
-
-def error_response(message: str, status_code: int = 400) -> JSONResponse:
-    return JSONResponse(
-        status_code=status_code,
-        content={
-            "success": False,
-            "error": message,
-        },
-    )
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    # pydantic-core serializes the model straight to JSON bytes, skipping both the
+    # intermediate dict of model_dump() and the str round-trip of model_dump_json().
+    payload = model.__pydantic_serializer__.to_json(model)
+    return Response(content=_SUCCESS_PREFIX + payload + _SUFFIX, status_code=status_code, media_type="application/json")
@@ -0,0 +1,27 @@
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+from app.services.migration_service import run_migrations
+
+# Kept apart from app.main so the supervisor process does not import the app
+# (MySQL pools) only to hand it off to the worker processes.
+if __name__ == "__main__":
+    load_dotenv()
+    # Apply pending migrations once before forking, so workers start against an
+    # up-to-date schema instead of queueing on the migration lock.
+    run_migrations()
+
+    # "auto" picks uvloop/httptools when installed (uvicorn[standard]) and
+    # falls back to asyncio/h11 on platforms without them, e.g. Windows.
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("UVICORN_WORKERS", str(os.cpu_count() or 1))),
+        loop="auto",
+        http="auto",
+        limit_concurrency=1024,
+        backlog=2048,
+    )